@@ -1,6 +1,24 @@
 """VisiData loader for BED (Browser Extensible Data) files."""
 
+import mmap
+import os
+import stat
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
 from copy import copy
+from functools import lru_cache, partial
+from itertools import accumulate
+from operator import itemgetter
+
+try:
+    from isal import igzip  # ISA-L accelerated gzip, optional
+except ImportError:
+    igzip = None
+
+try:
+    import cgranges  # interval index for overlap queries, optional
+except ImportError:
+    cgranges = None
 
 from visidata import (
     Sheet,
@@ -16,18 +34,375 @@ from visidata import (
 )
 
 
+# BED fields that stay text (besides chrom, which is interned separately);
+# the rest are numeric and parsed straight from bytes
+TEXT_FIELDS = (3, 5, 8, 10, 11)
+
+# Comment/browser/track lines; checking the first byte lets data lines skip the prefix compare
+HEADER_PREFIXES = (b"#", b"browser", b"track")
+HEADER_FIRST_BYTES = frozenset(b"#bt")
+
+# Bytes read from the head of a file when guessing/sniffing its format
+SAMPLE_SIZE = 8192
+# Most bytes read while looking past header lines for the first data line
+MAX_SAMPLE_SIZE = 1 << 20
+
+# Bytes of a BED file (memory-mapped or decompressed) split into lines at a time
+BLOCK_SIZE = 1 << 20
+
+
+def _iter_block_lines(fp):
+    """Yield the lines of the binary file fp, read in BLOCK_SIZE blocks, without line terminators."""
+    tail = b""
+    while True:
+        block = fp.read(BLOCK_SIZE)
+        if not block:
+            break
+        # Split a whole block at once, carrying the partial last line over
+        lines = block.split(b"\n")
+        lines[0] = tail + lines[0]
+        tail = lines.pop()
+        if b"\r" in block or lines and lines[0].endswith(b"\r"):
+            lines = [line.rstrip(b"\r") for line in lines]
+        yield from lines
+    if tail:
+        yield tail.rstrip(b"\r")
+
+
+def iter_lines(source):
+    """Yield the lines of source as bytes, without line terminators.
+
+    Uncompressed files are memory-mapped; compressed sources and pipes are read
+    in large blocks (through python-isal for gzip when it is installed). Either
+    way each block is split into lines with one bytes.split call.
+    """
+    if source.compression:
+        # python-isal inflates gzip several times faster than the stdlib gzip module
+        fp = igzip.open(str(source), "rb") if igzip and source.compression == "gz" else source.open_bytes()
+        with fp:
+            yield from _iter_block_lines(fp)
+        return
+
+    with source.open_bytes() as fp:
+        try:
+            mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:  # pipes such as stdin cannot be mapped
+            yield from _iter_block_lines(fp)
+            return
+        except ValueError:  # empty files cannot be mapped
+            return
+
+        with mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):  # not available on Windows
+                mm.madvise(mmap.MADV_SEQUENTIAL)  # read ahead aggressively, drop pages once passed
+            pos = 0
+            size = len(mm)
+            while pos < size:
+                # Take about BLOCK_SIZE bytes, cut at the last newline, and split the
+                # whole block in one C-level call rather than finding lines one by one
+                end = min(pos + BLOCK_SIZE, size)
+                if end < size:
+                    nl = mm.rfind(b"\n", pos, end)
+                    end = nl + 1 if nl >= 0 else mm.find(b"\n", end) + 1 or size
+                block = mm[pos:end]
+                pos = end
+
+                lines = block.split(b"\n")
+                if not lines[-1]:
+                    lines.pop()  # block ended with a newline
+                if b"\r" in block:
+                    lines = [line.rstrip(b"\r") for line in lines]
+                yield from lines
+
+
+def _is_regular_file(source):
+    """Return True if source is a regular file, which can be sampled and then read again"""
+    try:
+        return stat.S_ISREG(os.stat(source).st_mode)
+    except (OSError, TypeError):  # stdin, URLs
+        return False
+
+
+def sample_data_lines(source, sample_size=SAMPLE_SIZE):
+    """Return the data lines within the first sample_size bytes of source.
+
+    Reading a single bounded block keeps format sniffing cheap however large
+    the file is; if it holds only header lines, following blocks are read, up
+    to MAX_SAMPLE_SIZE bytes in all. Each block is extended to the end of the
+    line it cuts, so the last line returned is complete. Stdin and other streams are not sampled,
+    since the loader could not read those bytes again.
+    """
+    if not _is_regular_file(source):
+        return []
+    lines = []
+    nread = 0
+    with source.open_bytes() as fp:
+        # Read further blocks only while no data line has been seen, so a long
+        # browser/track/comment header does not hide the data
+        while not lines and nread < MAX_SAMPLE_SIZE:
+            sample = fp.read(sample_size)
+            if not sample:
+                break
+            if len(sample) == sample_size and not sample.endswith(b"\n"):
+                sample += fp.readline()
+            nread += len(sample)
+            lines = [
+                line
+                for line in sample.splitlines()
+                if line and not (line[0] in HEADER_FIRST_BYTES and line.startswith(HEADER_PREFIXES))
+            ]
+    return lines
+
+
+def first_data_line(source, sample_size=SAMPLE_SIZE):
+    """Return the first non-header line of source, as sampled by sample_data_lines.
+
+    Returns None if there is no data line in the sample.
+    """
+    lines = sample_data_lines(source, sample_size)
+    return lines[0] if lines else None
+
+
+def sniff_ncols(source):
+    """Return the largest number of fields among the sampled data lines of source, or None.
+
+    Optional columns may only appear on later lines, so every sampled line counts.
+    Whole lines are split (BED has at most 12 fields), since blockSizes and
+    blockStarts alone can run to hundreds of bytes.
+    """
+    lines = sample_data_lines(source)
+    return max(len(line.split(b"\t", 11)) for line in lines) if lines else None
+
+
+def _validate_score(score):
+    """Validate and clamp score between 0-1000"""
+    return min(max(score, 0), 1000)
+
+
+def _validate_strand(strand):
+    """Validate strand is +, -, or ."""
+    return strand if strand in ('+', '-', '.') else '.'
+
+
+def _validate_rgb(rgb):
+    """Validate RGB string format (comma-separated or hex)"""
+    try:
+        if rgb.startswith('#'):
+            # Convert hex to RGB
+            rgb = rgb.lstrip('#')
+            r = int(rgb[0:2], 16)
+            g = int(rgb[2:4], 16)
+            b = int(rgb[4:6], 16)
+        else:
+            r,g,b = map(int, rgb.split(','))
+        return f"{min(max(r,0),255)},{min(max(g,0),255)},{min(max(b,0),255)}"
+    except:
+        return "0,0,0"
+
+
+# Column getters; bound to their field index with functools.partial in BedSheet.reload.
+# Rows are padded with None up to the sniffed column count, so no bounds checks are needed.
+
+def _validated_get(idx, type_func, validator, col, row):
+    """Getter for an optional field that is converted and then validated"""
+    try:
+        val = row[idx]
+        # Comma-separated values are passed through as-is
+        if type_func is str and ',' in val:
+            return val.rstrip(',')
+        return validator(type_func(val))
+    except (ValueError, TypeError):  # includes None, for a padded missing field
+        return None
+
+
+def _thick_get(idx, bound_idx, clamp, col, row):
+    """Getter for thickStart/thickEnd, clamped to the feature bounds"""
+    try:
+        return clamp(int(row[idx]), row[bound_idx])
+    except ValueError:
+        return row[bound_idx]  # default to chromStart/chromEnd
+    except TypeError:  # None, for a padded missing field
+        return None
+
+
+@lru_cache(maxsize=4096)
+def validate_blocks(start, end, block_sizes, block_starts):
+    """Return (count, sizes, starts) for the blocks lying within the feature bounds.
+
+    Memoized, since the block columns call this each time a cell is drawn.
+    """
+    if not (block_sizes and block_starts):
+        return 0, "", ""
+
+    sizes = list(map(int, block_sizes.rstrip(',').split(',')))
+    starts = list(map(int, block_starts.rstrip(',').split(',')))
+
+    if len(sizes) != len(starts):
+        return 0, "", ""
+
+    # Keep blocks within feature bounds: start <= start+rel_start and start+rel_start+size <= end
+    span = end - start
+    blocks = list(zip(sizes, starts))
+    if all(rel_start >= 0 and rel_start + size <= span for size, rel_start in blocks):
+        # Common case: nothing to drop, so return the fields as given instead of re-joining
+        return len(blocks), block_sizes.rstrip(','), block_starts.rstrip(',')
+
+    valid = [(size, rel_start) for size, rel_start in blocks
+             if rel_start >= 0 and rel_start + size <= span]
+
+    if not valid:
+        return 0, "", ""
+
+    valid_sizes, valid_starts = zip(*valid)
+    return len(valid), ",".join(map(str, valid_sizes)), ",".join(map(str, valid_starts))
+
+def _block_get(part, col, row):
+    """Getter for blockCount (part 0), blockSizes (1) or blockStarts (2).
+
+    Blocks are validated when displayed rather than for every row at load time.
+    """
+    if row[9 + part] is None:
+        return None
+    try:
+        count = int(row[9])
+        if count > 0 and len(row) >= 12 and row[11] is not None:
+            return validate_blocks(row[1], row[2], row[10], row[11])[part]
+    except (ValueError, TypeError):
+        count = 0
+    return count if part == 0 else row[9 + part].rstrip(',')
+
+
+class IntervalIndex:
+    """Overlap index over BED rows, shared by the BED sheets.
+
+    chrom, start and end are getters for the row fields (itemgetters for list rows,
+    attrgetters for record objects). by_chrom maps each chrom to (starts, max_ends,
+    rows) with rows sorted by start and max_ends[i] the largest end among rows[:i+1],
+    so a query bisects both lists and only scans rows that can overlap. cgranges is
+    used for overlap queries when it is installed.
+    """
+
+    def __init__(self, rows, chrom=itemgetter(0), start=itemgetter(1), end=itemgetter(2)):
+        self.nrows = 0
+        self.end = end
+        self.cr = None  # cgranges index and its rows, built on the first query
+
+        groups = defaultdict(list)
+        for row in rows:
+            groups[chrom(row)].append(row)
+            self.nrows += 1
+        self.by_chrom = {}
+        for c, chrom_rows in groups.items():
+            chrom_rows.sort(key=start)
+            starts = list(map(start, chrom_rows))
+            max_ends = list(accumulate(map(end, chrom_rows), max))
+            self.by_chrom[c] = (starts, max_ends, chrom_rows)
+
+    def overlap(self, chrom, start, end):
+        """Return the rows overlapping the half-open interval [start, end) on chrom"""
+        if cgranges:
+            if self.cr is None:
+                cr, cr_rows = cgranges.cgranges(), []
+                for c, (starts, _, chrom_rows) in self.by_chrom.items():
+                    for s, row in zip(starts, chrom_rows):
+                        cr.add(c, s, self.end(row), len(cr_rows))
+                        cr_rows.append(row)
+                cr.index()
+                self.cr = (cr, cr_rows)
+            cr, cr_rows = self.cr
+            return [cr_rows[i] for _, _, i in cr.overlap(chrom, start, end)]
+
+        if chrom not in self.by_chrom:
+            return []
+        starts, max_ends, chrom_rows = self.by_chrom[chrom]
+        lo = bisect_right(max_ends, start)  # rows before lo all end at or before start
+        hi = bisect_left(starts, end)
+        end_of = self.end
+        return [r for r in chrom_rows[lo:hi] if end_of(r) > start]
+
+
+class IntervalIndexMixin:
+    """Sheet mixin caching an IntervalIndex over the rows.
+
+    The index is dropped whenever rows are added or deleted or a cell is edited
+    (addRow, deleteBy and setModified). Sheets that replace or extend self.rows
+    directly, as reload does, must call invalidate_interval_index() themselves.
+    """
+
+    # chrom, start and end getters passed to IntervalIndex
+    interval_fields = (itemgetter(0), itemgetter(1), itemgetter(2))
+
+    _interval_index = None
+
+    def interval_index(self):
+        """Return the IntervalIndex for the current rows, rebuilding it if stale"""
+        index = self._interval_index
+        # undo can restore rows without going through addRow/deleteBy
+        if index is None or index.nrows != len(self.rows):
+            index = self._interval_index = IntervalIndex(self.rows, *self.interval_fields)
+        return index
+
+    def invalidate_interval_index(self):
+        self._interval_index = None
+
+    def addRow(self, row, index=None):
+        self._interval_index = None
+        return super().addRow(row, index=index)
+
+    def deleteBy(self, *args, **kwargs):
+        self._interval_index = None
+        return super().deleteBy(*args, **kwargs)
+
+    def setModified(self):
+        self._interval_index = None
+        return super().setModified()
+
+
+def is_bed_line(line):
+    """Return True if line (bytes) starts with chrom, chromStart and chromEnd fields"""
+    # Only chrom, chromStart and chromEnd are needed; don't split the whole line
+    i1 = line.find(b"\t")
+    i2 = line.find(b"\t", i1 + 1)
+    if i1 <= 0 or i2 < 0:
+        return False
+    i3 = line.find(b"\t", i2 + 1)
+    try:
+        start = int(line[i1 + 1:i2])
+        end = int(line[i2 + 1:i3 if i3 >= 0 else len(line)])
+    except ValueError:
+        return False
+    return 0 <= start <= end  # zero-length features (insertions) are valid
+
+
+@VisiData.api
+def guess_bed(vd, p):
+    """Guess if file is BED format from its first data line"""
+    line = first_data_line(p)
+    if line is not None and is_bed_line(line):
+        return dict(filetype="bed", _likelihood=9)
+    return None
+
+
 @VisiData.api
 def open_bed(vd, p):
-    """Try to open as BED, fall back to TSV if parsing fails"""
-    try:
-        sheet = BedSheet(p.name, source=p)
-        sheet.reload()
-        if not sheet.rows:  # If no rows were successfully parsed
-            return TsvSheet(p.name, source=p)
-        return sheet
-    except Exception as e:
-        vd.warning(f"Failed to parse as BED ({str(e)}), falling back to TSV")
+    """Open as BED unless the first data line is clearly not BED, then as TSV.
+
+    Deciding from a small sample avoids parsing the whole file just to discover
+    it needs the TSV fallback; the BED sheet itself then loads asynchronously.
+    Sources that cannot be sampled, like stdin, are opened as BED.
+    """
+    line = first_data_line(p)
+    if line is not None and not is_bed_line(line):
+        vd.warning("first data line is not BED, falling back to TSV")
         return TsvSheet(p.name, source=p)
+    return BedSheet(p.name, source=p)
+
+
+class IntItemColumn(ItemColumn):
+    """ItemColumn storing edited values as int, as the loader does, so the overlap index can compare them"""
+
+    def putValue(self, row, val):
+        super().putValue(row, int(val))
 
 
 class TrackAttributesSheet(Sheet):
@@ -56,14 +431,17 @@ class TrackAttributesSheet(Sheet):
 
     def addRow(self, row, index=None):
         super().addRow(row, index=index)
-        
-        # Add columns for any new keys
+
+        # Add columns for any new keys; names are taken from the current columns,
+        # so resets, deletions and renames are always reflected
+        colnames = {c.name for c in self.columns}
         for k in row:
-            if not any(c.name == k for c in self.columns):
+            if k not in colnames:
                 self.addColumn(ItemColumn(k))
+                colnames.add(k)
 
 
-class BedSheet(TsvSheet):
+class BedSheet(IntervalIndexMixin, TsvSheet):
     """Sheet for displaying BED format data.
     
     Handles the Browser Extensible Data (BED) format which defines genomic regions.
@@ -82,6 +460,8 @@ class BedSheet(TsvSheet):
         super().__init__(name, source=source, delimiter="\t", **kwargs)
         self.track_lines = []  # Store track lines for later reference
         self.header_lines = []  # Store browser/track/comment lines
+        self._ncols = None  # sniffed column count, reused across reloads
+        self._sniff_mtime = None  # source mtime when _ncols was sniffed
         
     def openRow(self, row):
         """Allow diving into track attributes when row is a track line"""
@@ -89,174 +469,170 @@ class BedSheet(TsvSheet):
             return TrackAttributesSheet(name=f"track_attributes", source=row)
         return None
 
-    def validate_blocks(self, start, end, block_count, block_sizes, block_starts):
-        """Validate block coordinates are within feature bounds"""
-        if not (block_sizes and block_starts):
-            return 0, "", ""
-            
-        sizes = [int(x) for x in block_sizes.rstrip(',').split(',')]
-        starts = [int(x) for x in block_starts.rstrip(',').split(',')]
-        
-        if len(sizes) != len(starts):
-            return 0, "", ""
-            
-        # Validate each block
-        valid_sizes = []
-        valid_starts = []
-        for size, rel_start in zip(sizes, starts):
-            abs_start = start + rel_start
-            abs_end = abs_start + size
-            
-            # Block must be within feature bounds
-            if abs_start >= start and abs_end <= end:
-                valid_sizes.append(str(size))
-                valid_starts.append(str(rel_start))
-                
-        if not valid_sizes:
-            return 0, "", ""
-            
-        return len(valid_sizes), ",".join(valid_sizes), ",".join(valid_starts)
-
-    @asyncthread
-    def reload(self):
-        self.columns = []
-        self.rows = []
+    def overlaps(self, chrom, start, end):
+        """Return the rows overlapping the half-open interval [start, end) on chrom"""
+        return self.interval_index().overlap(chrom, start, end)
 
-        def make_getter(idx, type_func=str, validator=None):
-            def _getter(row):
-                if not row or idx >= len(row):
-                    return None
-                try:
-                    val = row[idx]
-                    # Special handling for comma-separated values
-                    if isinstance(val, str) and ',' in val and type_func == str:
-                        return val.rstrip(',')
-                    # Normal type conversion
-                    val = type_func(val) if val is not None else None
-                    # Apply validator if provided 
-                    return validator(val) if validator and val is not None else val
-                except (IndexError, ValueError, TypeError):
-                    return None
-
-            # Create a wrapper that matches VisiData's expected signature
-            return lambda sheet, row, *args: _getter(row)
-
-        def validate_score(score):
-            """Validate and clamp score between 0-1000"""
-            try:
-                score = float(score)
-                return min(max(score, 0), 1000)
-            except (ValueError, TypeError):
-                return 0
-
-        def validate_strand(strand):
-            """Validate strand is +, -, or ."""
-            return strand if strand in ('+', '-', '.') else '.'
-
-        def validate_rgb(rgb):
-            """Validate RGB string format (comma-separated or hex)"""
-            try:
-                if rgb.startswith('#'):
-                    # Convert hex to RGB
-                    rgb = rgb.lstrip('#')
-                    r = int(rgb[0:2], 16)
-                    g = int(rgb[2:4], 16)
-                    b = int(rgb[4:6], 16)
-                else:
-                    r,g,b = map(int, rgb.split(','))
-                return f"{min(max(r,0),255)},{min(max(g,0),255)},{min(max(b,0),255)}"
-            except:
-                return "0,0,0"
+    def select_overlapping(self, region):
+        """Select rows overlapping region, a genome browser position like chr1:1,001-2,000"""
+        chrom, _, span = region.strip().rpartition(":")
+        start, _, end = span.replace(",", "").partition("-")
+        # Browser positions are 1-based and inclusive; BED is 0-based, half-open
+        self.select(self.overlaps(chrom, int(start) - 1, int(end)))
 
-        # Required BED fields with validation
-        self.addColumn(Column(name="chrom", type=str, getter=make_getter(0)))
-        self.addColumn(Column(name="start", type=int, getter=make_getter(1, int)))
-        self.addColumn(Column(name="end", type=int, getter=make_getter(2, int)))
+    def iterload(self):
+        """Parse the source, yielding one list of fields per valid region.
 
-        # Optional BED fields with their types and validators
-        optional_cols = [
-            ("name", 3, str, None),  # Name of region
-            ("score", 4, float, validate_score),  # Score from 0-1000
-            ("strand", 5, str, validate_strand),  # + or - for strand
-            ("thickStart", 6, int, None),  # Starting position at which feature is drawn thickly
-            ("thickEnd", 7, int, None),  # Ending position at which feature is drawn thickly
-            ("itemRgb", 8, str, validate_rgb),  # RGB color value (e.g., 255,0,0)
-            ("blockCount", 9, int, None),  # Number of blocks (exons)
-            ("blockSizes", 10, str, None),  # Comma-separated list of block sizes
-            ("blockStarts", 11, str, None),  # Comma-separated list of block starts
-        ]
+        Header lines (comments, browser and track lines) are collected in
+        self.header_lines rather than yielded.
+        """
+        header_lines = self.header_lines
+        # Specialise to the sniffed shape: lines with ncols fields skip per-field bounds checks
+        ncols = self._ncols or 12
+        text_fields = tuple(i for i in TEXT_FIELDS if i < ncols)
+        # Bad lines are tallied by reason and reported once, after loading
+        self.skipped = skipped = Counter()
+        examples = {}  # reason -> first line skipped for it
 
-        for name, idx, type_func, validator in optional_cols:
-            self.addColumn(Column(name=name, type=type_func, getter=make_getter(idx, type_func, validator)))
+        def skip(reason, line):
+            skipped[reason] += 1
+            examples.setdefault(reason, line)
 
-        # Load the data
-        with self.source.open_text() as fp:
-            lines = fp.readlines()
-            for line in Progress(lines, "loading BED file"):
-                line = line.rstrip("\n")
+        # Progress counts decompressed bytes, so a compressed file's size is no total for it
+        total = None if self.source.compression else self.source.filesize
+        with Progress(gerund="loading BED file", total=total) as prog:
+            # Bind per-line callables and globals to locals once, outside the hot loop
+            add_progress = prog.addProgress
+            add_header = header_lines.append
+            header_first_bytes = HEADER_FIRST_BYTES
+            chroms = {}  # raw chrom bytes -> interned str
+            for line in iter_lines(self.source):
+                add_progress(len(line) + 1)  # progress by bytes, not lines
                 if not line:
                     continue
-                if line.startswith(("#", "browser", "track")):
-                    self.header_lines.append(line)
+                if line[0] in header_first_bytes and line.startswith(HEADER_PREFIXES):
+                    add_header(line.decode())
                     continue
                 try:
-                    fields = line.split("\t")  # Explicitly split on tabs
+                    # BED defines at most 12 fields; anything after is left in one unsplit tail
+                    fields = line.split(b"\t", 12)
+                    # Share one str per distinct chrom instead of decoding a new one per row
+                    chrom = chroms.get(fields[0])
+                    if chrom is None:
+                        chrom = chroms[fields[0]] = fields[0].decode()
+                    fields[0] = chrom
+                    # Decode text fields only; int()/float() accept bytes directly
+                    if len(fields) == ncols:
+                        for i in text_fields:
+                            fields[i] = fields[i].decode()
+                    else:
+                        for i in TEXT_FIELDS:
+                            if i < len(fields):
+                                fields[i] = fields[i].decode()
                     # Ensure minimum 3 fields
                     if len(fields) < 3:
-                        vd.warning(f"skipping line with too few fields: {line[:50]}...")
+                        skip("too few fields", line)
                         continue
 
                     # Validate required fields
                     if not fields[0].strip():
-                        vd.warning(f"skipping line with empty chromosome: {line[:50]}...")
+                        skip("empty chromosome", line)
                         continue
 
-                    # Convert coordinates - BED uses 0-based start and 1-based end
-                    try:
-                        start = int(fields[1])
-                        end = int(fields[2])
-                        if start < 0:
-                            vd.warning(f"invalid negative start coordinate: {line[:50]}...")
-                            continue
-                        if end <= start:
-                            vd.warning(f"end coordinate must be greater than start: {line[:50]}...")
-                            continue
-                        fields[1] = start
-                        fields[2] = end
-                    except ValueError as e:
-                        vd.warning(f"invalid coordinates in line: {line[:50]}... {str(e)}")
+                    # Convert coordinates - BED uses 0-based start and 1-based end.
+                    # isdigit() rejects bad (including negative) values without raising.
+                    if not (fields[1].isdigit() and fields[2].isdigit()):
+                        skip("invalid coordinates", line)
                         continue
+                    start = int(fields[1])
+                    end = int(fields[2])
+                    if end < start:
+                        skip("end coordinate less than start", line)
+                        continue
+                    fields[1] = start
+                    fields[2] = end
+
+                    # Pad short lines to the sniffed width so getters can index unconditionally
+                    if len(fields) < ncols:
+                        fields.extend([None] * (ncols - len(fields)))
 
-                    # Handle optional fields
-                    if len(fields) >= 7:  # thickStart/End exist
-                        try:
-                            thick_start = int(fields[6])
-                            thick_end = int(fields[7])
-                            # Validate thick coordinates are within feature bounds
-                            fields[6] = max(thick_start, start)
-                            fields[7] = min(thick_end, end)
-                        except (ValueError, TypeError):
-                            fields[6] = start  # default to chromStart
-                            fields[7] = end    # default to chromEnd
-
-                    if len(fields) >= 10:  # blockCount/Sizes/Starts exist
-                        try:
-                            block_count = int(fields[9])
-                            if block_count > 0 and len(fields) >= 12:
-                                # Validate and clean block coordinates
-                                valid_count, valid_sizes, valid_starts = self.validate_blocks(
-                                    start, end, block_count,
-                                    fields[10], fields[11]
-                                )
-                                fields[9] = valid_count
-                                fields[10] = valid_sizes
-                                fields[11] = valid_starts
-                        except (ValueError, TypeError):
-                            fields[9] = 0
-
-                    self.addRow(fields)
+                    # Optional numeric fields stay raw; their Column getters coerce on access
+                    yield fields
                 except Exception as e:
-                    vd.warning(f"error parsing line: {line[:50]}... {str(e)}")
+                    skip(f"error parsing line ({type(e).__name__})", line)
 
-        # Register BED format detection
-        vd.option('filetype', 'bed', 'BED', BedSheet)
+        for reason, n in skipped.items():
+            example = examples[reason][:50].decode(errors="replace")
+            vd.warning(f"skipped {n} lines: {reason} (first: {example}...)")
+
+    @asyncthread
+    def reload(self):
+        self.columns = []
+        self.rows = []
+
+        # Required BED fields with validation
+        # (start/end are converted to int once, by the loader)
+        self.addColumn(ItemColumn("chrom", 0, type=str))
+        self.addColumn(IntItemColumn("start", 1, type=int))
+        self.addColumn(IntItemColumn("end", 2, type=int))
+
+        # Optional BED fields with their types and validators
+        optional_cols = [
+            ("name", 3, str, None),  # Name of region
+            ("score", 4, float, _validate_score),  # Score from 0-1000
+            ("strand", 5, str, _validate_strand),  # + or - for strand
+            ("itemRgb", 8, str, _validate_rgb),  # RGB color value (e.g., 255,0,0)
+        ]
+
+        # Only add the optional columns this file actually has.
+        # Path.stat() is cached, so ask the OS; stdin and URLs have no mtime
+        try:
+            mtime = os.stat(self.source).st_mtime
+        except (OSError, TypeError):
+            mtime = None
+        if self._ncols is None or mtime is None or mtime != self._sniff_mtime:
+            self._ncols = sniff_ncols(self.source) or 12  # assume full BED12
+            self._sniff_mtime = mtime
+        ncols = self._ncols
+        for name, idx, type_func, validator in optional_cols:
+            if idx >= ncols:
+                continue
+            if validator:
+                getter = partial(_validated_get, idx, type_func, validator)
+                self.addColumn(Column(name=name, type=type_func, getter=getter))
+            else:
+                # Plain fields index the row directly; no Python-level getter
+                self.addColumn(ItemColumn(name, idx, type=type_func))
+
+        # thickStart/End are coerced lazily and kept within chromStart..chromEnd
+        if ncols > 6:
+            self.addColumn(Column(name="thickStart", type=int, getter=partial(_thick_get, 6, 1, max)), index=6)
+        if ncols > 7:
+            self.addColumn(Column(name="thickEnd", type=int, getter=partial(_thick_get, 7, 2, min)), index=7)
+
+        # Blocks are checked against the feature bounds lazily, when displayed
+        if ncols > 9:
+            self.addColumn(Column(name="blockCount", type=int, getter=partial(_block_get, 0)))  # Number of blocks (exons)
+        if ncols > 10:
+            self.addColumn(Column(name="blockSizes", type=str, getter=partial(_block_get, 1)))  # Comma-separated list of block sizes
+        if ncols > 11:
+            self.addColumn(Column(name="blockStarts", type=str, getter=partial(_block_get, 2)))  # Comma-separated list of block starts
+
+        # Extend rows in batches rather than dispatching addRow per region
+        self.header_lines = []
+        self.invalidate_interval_index()
+        batch = []
+        for fields in self.iterload():
+            batch.append(fields)
+            if len(batch) >= 10000:
+                self.rows.extend(batch)
+                batch.clear()
+        self.rows.extend(batch)
+
+
+BedSheet.addCommand(
+    "",
+    "select-overlapping",
+    'select_overlapping(input("select regions overlapping (chrom:start-end): "))',
+    "select regions overlapping a genome position",
+)
@@ -1,11 +1,26 @@
 """VisiData loader for BED (Browser Extensible Data) files using pybedlite."""
 
+from bisect import bisect_left
+from collections import Counter
+from operator import attrgetter
+
 try:
-    import pybedlite as pybed
+    import pybedlite as pybed  # only needed to save pybedlite.BedRecord rows, optional
 except ImportError:
     pybed = None
-from pathlib import Path
-from visidata import VisiData, Sheet, Column, vd, asyncthread, options, ENTER, TextSheet, IndexSheet, Progress
+from visidata import VisiData, Sheet, Column, AttrColumn, vd, asyncthread, options, ENTER, TextSheet, IndexSheet, Progress
+
+# visidata imports plugins as the plugins package; fall back for a top-level import
+try:
+    from .bed import (
+        HEADER_FIRST_BYTES, HEADER_PREFIXES, IntervalIndex, IntervalIndexMixin,
+        first_data_line, is_bed_line, iter_lines,
+    )
+except ImportError:
+    from bed import (
+        HEADER_FIRST_BYTES, HEADER_PREFIXES, IntervalIndex, IntervalIndexMixin,
+        first_data_line, is_bed_line, iter_lines,
+    )
 
 # Define options directly instead of importing
 options.bed_skip_validation = False
@@ -20,33 +35,99 @@ options.bed_show_gc = False
 options.bed_to_gff_type = 'region'
 options.bed_to_gff_source = 'bed2gff'
 
+# Rows formatted per write() call in save_bed
+SAVE_BATCH_SIZE = 65536
+
+
+class BedRow:
+    """Lightweight BED record with the same attribute names as pybedlite.BedRecord.
+
+    Uses __slots__ so each row carries no per-instance __dict__, and stays mutable
+    so cells can be edited in place.
+    """
+
+    __slots__ = ('chrom', 'start', 'end', 'name', 'score', 'strand',
+                 'thick_start', 'thick_end', 'item_rgb',
+                 'block_count', 'block_sizes', 'block_starts')
+
+    def __init__(self, chrom, start, end, name='.', score='0', strand='.',
+                 thick_start=None, thick_end=None, item_rgb=None,
+                 block_count=None, block_sizes=None, block_starts=None):
+        self.chrom = chrom
+        self.start = start
+        self.end = end
+        self.name = name
+        self.score = score
+        self.strand = strand
+        self.thick_start = thick_start
+        self.thick_end = thick_end
+        self.item_rgb = item_rgb
+        self.block_count = block_count
+        self.block_sizes = block_sizes
+        self.block_starts = block_starts
+
+    def __repr__(self):
+        return f'BedRow({self.chrom}:{self.start}-{self.end} {self.name} {self.score} {self.strand})'
+
+
+# Colors used by colorize_strand; other strands are left uncolored
+STRAND_COLORS = {'+': 'red', '-': 'blue'}
+
+
+def _int_or_none(text):
+    """parse an optional integer field at load time; malformed values become None, so the columns need no conversion"""
+    try:
+        return int(text)
+    except ValueError:
+        return None
+
+
+def _join_csv(value):
+    """comma-separated text for itemRgb/blockSizes/blockStarts; raw text from the file is returned as-is"""
+    if value is None or value.__class__ is str:
+        return value or None
+    return ','.join(map(str, value))
+
+
+def _csv_ints(value):
+    """list of ints for itemRgb/blockSizes/blockStarts, whether stored as raw text or as a sequence"""
+    if value.__class__ is str:
+        return [int(x) for x in value.split(',') if x]
+    return list(value)
+
+
 # Register BED format detection first
 @VisiData.api
 def open_bed(vd, p):
     """Try to open as BED, fall back to TSV if parsing fails"""
-    if pybed is None:
-        vd.error("pybedlite module required for BED support. Install with: pip install pybedlite")
-        return vd.openSource(p, filetype='tsv')
     try:
-        sheet = BedPyblSheet(p.name, source=p)
-        sheet.reload()
-        # Wait for async reload to complete
-        while sheet.loading:
-            pass
-        if not sheet.rows:  # If no rows were successfully parsed
-            vd.warning("No valid BED records found, falling back to TSV")
+        # Decide from a small sample before committing to a full load;
+        # sources that cannot be sampled, like stdin, are loaded as BED
+        line = first_data_line(p)
+        if line is not None and not is_bed_line(line):
+            vd.warning("First data line is not BED, falling back to TSV")
             return vd.openSource(p, filetype='tsv')
-        return sheet
+        # Return the sheet unloaded; VisiData runs the async reload when it is pushed,
+        # so rows appear as they are parsed instead of after a blocking wait
+        return BedPyblSheet(p.name, source=p)
     except Exception as e:
         vd.warning(f"Failed to parse as BED ({str(e)}), falling back to TSV")
         return vd.openSource(p, filetype='tsv')
 
 
-class BedPyblSheet(Sheet):  # Fix: capitalize class name
+class IntAttrColumn(AttrColumn):
+    """AttrColumn storing edited values as int, so coordinate arithmetic keeps working."""
+
+    def putValue(self, row, val):
+        super().putValue(row, None if val is None else int(val))
+
+
+class BedPyblSheet(IntervalIndexMixin, Sheet):  # Fix: capitalize class name
     """Sheet for displaying BED format data using pybedlite."""
 
     rowtype = "genomic regions"
     required_fields = ['chrom', 'start', 'end']
+    interval_fields = (attrgetter('chrom'), attrgetter('start'), attrgetter('end'))
 
     def __init__(self, name, source=None, **kwargs):
         super().__init__(name, source=source, **kwargs)
@@ -69,34 +150,36 @@ class BedPyblSheet(Sheet):  # Fix: capitalize class name
         self.bindkey('gf', 'convert-to-gff')  # convert to gff format
 
         # define columns based on bedrecord attributes with better descriptions
-        self.addColumn(Column("chrom", getter=lambda col, row: row.chrom,
+        # plain attributes are read by AttrColumn directly, without a per-cell lambda;
+        # numeric ones store edits as int
+        self.addColumn(AttrColumn("chrom", "chrom",
                             help="Chromosome name"))
-        self.addColumn(Column("start", type=int, getter=lambda col, row: row.start,
+        self.addColumn(IntAttrColumn("start", "start", type=int,
                             help="Start position (0-based)"))
-        self.addColumn(Column("end", type=int, getter=lambda col, row: row.end,
+        self.addColumn(IntAttrColumn("end", "end", type=int,
                             help="end position (exclusive)"))
-        self.addColumn(Column("name", getter=lambda col, row: row.name,
+        self.addColumn(AttrColumn("name", "name",
                             help="feature name"))
-        self.addColumn(Column("score", getter=lambda col, row: row.score,
+        self.addColumn(AttrColumn("score", "score",
                             help="score from 0-1000"))
-        self.addColumn(Column("strand", getter=lambda col, row: row.strand,
+        self.addColumn(AttrColumn("strand", "strand",
                             help="strand (+, -, or .)"))
-        self.addColumn(Column("thickstart", getter=lambda col, row: self._safe_convert(row.thick_start, int),
+        self.addColumn(IntAttrColumn("thickstart", "thick_start", type=int,
                             help="start of thick drawing"))
-        self.addColumn(Column("thickend", getter=lambda col, row: self._safe_convert(row.thick_end, int),
+        self.addColumn(IntAttrColumn("thickend", "thick_end", type=int,
                             help="end of thick drawing"))
-        self.addColumn(Column("itemrgb", getter=lambda col, row: ",".join(map(str, row.item_rgb)) if row.item_rgb else None,
+        self.addColumn(Column("itemrgb", getter=lambda col, row: _join_csv(row.item_rgb),
                             help="rgb color (r,g,b)"))
-        self.addColumn(Column("blockcount", getter=lambda col, row: self._safe_convert(row.block_count, int),
+        self.addColumn(IntAttrColumn("blockcount", "block_count", type=int,
                             help="number of blocks/exons"))
-        self.addColumn(Column("blocksizes", getter=lambda col, row: ",".join(map(str, row.block_sizes)) if row.block_sizes else None,
+        self.addColumn(Column("blocksizes", getter=lambda col, row: _join_csv(row.block_sizes),
                             help="block sizes in bases"))
-        self.addColumn(Column("blockstarts", getter=lambda col, row: ",".join(map(str, row.block_starts)) if row.block_starts else None,
+        self.addColumn(Column("blockstarts", getter=lambda col, row: _join_csv(row.block_starts),
                             help="block starts relative to start"))
 
         # add computed columns
         self.addColumn(Column("length",
-                      getter=lambda col, row: self.get_region_length(row),
+                      getter=lambda col, row: row.end - row.start,
                       type=int,
                       help="region length in bp"))
 
@@ -105,96 +188,91 @@ class BedPyblSheet(Sheet):  # Fix: capitalize class name
                       type=int,
                       help="distance to next region"))
 
-    def _safe_convert(self, value, type_func):
-        """safely convert value to given type, return none if fails"""
-        if value is None or value == '':
-            return None
-        try:
-            return type_func(value)
-        except (ValueError, TypeError):
-            vd.debug(f'could not convert {value} to {type_func.__name__}')
-            return value  # return original value instead of none
-
     @asyncthread
     def reload(self):
         """Load BED records from file."""
         self.rows = []
-        self.loading = True  # Fix: capitalize boolean values
+        self.invalidate_interval_index()
 
         vd.status('Starting BED file load...')
+        self.header_lines = []
 
-        # First pass to collect header lines
-        header_count = 0
-        with self.source.open_text() as fp:
-            for line in fp:
-                line = line.rstrip('\n')
-                if line.startswith(('track', 'browser')):  # remove # from header check since it's not standard
-                    self.header_lines.append(line)
-                    header_count += 1
-
-        vd.status(f'Found {header_count} header lines')
-
-        # Second pass to load records using pybedlite
+        # Single pass: header lines are collected as they appear, records parsed as they arrive
         try:
-            bed_path = Path(self.source.resolve())  # Fix: capitalize Path
-            vd.status(f'Processing BED file: {bed_path}')
-
-            with bed_path.open() as bed_file:
-                vd.status('Creating pybedlite reader...')
-                # Skip header lines
-                for _ in range(len(self.header_lines)):
-                    next(bed_file)
-
-                count = 0
-                for line in bed_file:
-                    line = line.strip()
-                    if not line or line.startswith(('track', 'browser')):
-                        continue
-
-                    fields = line.split('\t')
-                    if len(fields) < 3:  # Must have at least chrom, start, end
+            vd.status(f'Processing BED file: {self.source}')
+
+            # Lines arrive as bytes: header checks run on them and only data lines are decoded
+            count = 0
+            chroms = {}  # one shared str per chromosome name
+            batch = []  # appended to self.rows in blocks rather than one addRow per record
+            append, extend = batch.append, self.rows.extend
+            validate = not options.bed_skip_validation
+            invalid = 0  # counted and reported once, not warned per record
+            for line in iter_lines(self.source):
+                if not line:
+                    continue
+                if line[0] in HEADER_FIRST_BYTES and line.startswith(HEADER_PREFIXES):
+                    self.header_lines.append(line.decode(errors='replace'))
+                    continue
+
+                try:
+                    fields = line.decode().split('\t')
+                    n = len(fields)
+                    if n < 3:  # Must have at least chrom, start, end
                         continue
 
-                    try:
-                        record = pybed.BedRecord(  # Fix: capitalize class name
-                            chrom=fields[0],
-                            start=int(fields[1]),
-                            end=int(fields[2]),
-                            name=fields[3] if len(fields) > 3 else '.',
-                            score=fields[4] if len(fields) > 4 else '0',
-                            strand='.' if len(fields) <= 5 else fields[5],
-                            thick_start=None,  # Fix: capitalize None
-                            thick_end=None,
-                            item_rgb=None,
-                            block_count=None,
-                            block_sizes=None,
-                            block_starts=None
-                        )
-
-                        if count == 0:
-                            vd.status(f'First record found: {record}')
-                        self.addRow(record)  # Fix: capitalize method name
-                        count += 1
-                        if count % 1000 == 0:
-                            vd.status(f'Loaded {count} records...')
-                    except (ValueError, IndexError) as e:  # Fix: capitalize exception names
-                        vd.debug(f'Skipping malformed record: {line} ({str(e)})')
+                    start, end = int(fields[1]), int(fields[2])
+                    if validate and not 0 <= start <= end:
+                        invalid += 1
                         continue
 
-                vd.status(f'Completed loading {count} BED records')
+                    chrom = chroms.setdefault(fields[0], fields[0])
+                    record = BedRow(chrom, start, end,
+                                    fields[3] if n > 3 else '.',
+                                    fields[4] if n > 4 else '0',
+                                    fields[5] if n > 5 else '.')
+                    if n > 6:
+                        # itemRgb and the block lists keep the file's text; the columns show it verbatim
+                        record.thick_start = _int_or_none(fields[6])
+                        if n > 7:
+                            record.thick_end = _int_or_none(fields[7])
+                        if n > 8:
+                            record.item_rgb = fields[8]
+                        if n > 9:
+                            record.block_count = _int_or_none(fields[9])
+                        if n > 10:
+                            record.block_sizes = fields[10]
+                        if n > 11:
+                            record.block_starts = fields[11]
+
+                    append(record)
+                    count += 1
+                    if not count & 0x3FFF:  # every 16384 records
+                        extend(batch)
+                        batch.clear()
+                        if not count & 0xFFFF:  # every 65536 records
+                            vd.status('Loaded %d records...' % count)
+                except (ValueError, IndexError) as e:  # Fix: capitalize exception names
+                    vd.debug(f'Skipping malformed record: {line} ({str(e)})')
+                    continue
+
+            extend(batch)
+            if invalid:
+                vd.warning(f'skipped {invalid} records with invalid coordinates (need 0 <= start <= end)')
+            if self.rows and options.debug:
+                vd.debug(f'First record found: {self.rows[0]}')
+            vd.status(f'Completed loading {count} BED records')
 
         except Exception as e:
             vd.warning(f"Error reading BED file: {str(e)}")
             import traceback
             vd.debug(traceback.format_exc())
-        finally:
-            self.loading = False  # Fix: capitalize boolean value
 
     def colorize_strand(self, row):
         """return color based on strand."""
         if not options.bed_color_strands:
             return None
-        return ('red' if row.strand == '+' else 'blue' if row.strand == '-' else None)
+        return STRAND_COLORS.get(row.strand)
 
     def get_region_length(self, row):
         """calculate length of genomic region."""
@@ -203,13 +281,9 @@ class BedPyblSheet(Sheet):  # Fix: capitalize class name
     def show_region_stats(self, vd):
         """display statistics about the genomic regions."""
         total_regions = len(self.rows)
-        total_bases = sum(self.get_region_length(row) for row in self.rows)
-        strands = {}
-        chroms = {}
-
-        for row in self.rows:
-            strands[row.strand] = strands.get(row.strand, 0) + 1
-            chroms[row.chrom] = chroms.get(row.chrom, 0) + 1
+        total_bases = sum(map(attrgetter('end'), self.rows)) - sum(map(attrgetter('start'), self.rows))
+        strands = Counter(map(attrgetter('strand'), self.rows))
+        chroms = Counter(map(attrgetter('chrom'), self.rows))
 
         vd.status(f'regions: {total_regions}, total bases: {total_bases}, '
                  f'strands: {dict(strands)}, chromosomes: {len(chroms)}')
@@ -217,18 +291,14 @@ class BedPyblSheet(Sheet):  # Fix: capitalize class name
     def select_by_strand(self, vd):
         """interactive strand selection."""
         strand = vd.input("select strand (+/-/./other): ")
-        for row in self.rows:
-            if row.strand == strand:
-                row.selected = True
+        self.select([row for row in self.rows if row.strand == strand])
 
     def select_large_regions(self, vd):
         """select regions larger than threshold."""
         threshold = vd.input("minimum region size: ", value=str(options.bed_max_region_size))
         try:
             threshold = int(threshold)
-            for row in self.rows:
-                if self.get_region_length(row) > threshold:
-                    row.selected = True
+            self.select([row for row in self.rows if row.end - row.start > threshold])
         except ValueError:
             vd.warning("invalid threshold value")
 
@@ -252,34 +322,48 @@ class BedPyblSheet(Sheet):  # Fix: capitalize class name
 
         vd.push(TextSheet(f'details_{row.name}', source=details))
 
+    def chrom_index(self):
+        """per-chromosome regions sorted by start, as chrom -> (starts, max_ends, rows).
+
+        max_ends[i] is the largest end among the first i+1 regions, so it never decreases.
+        The index is rebuilt after any row is added, deleted or edited.
+        """
+        return self.interval_index().by_chrom
+
+    def overlapping(self, chrom, start, end):
+        """return rows on chrom overlapping the 0-based half-open interval [start, end)."""
+        return self.interval_index().overlap(chrom, start, end)
+
     def _get_distance_to_next(self, row):
         """calculate distance to next region on same chromosome."""
-        try:
-            idx = self.rows.index(row)
-            next_row = next((r for r in self.rows[idx+1:] if r.chrom == row.chrom), None)
-            if next_row:
-                return next_row.start - row.end
-        except (ValueError, IndexError):
-            pass
-        return None
+        if self.loading:
+            # the index would be rebuilt over all loaded rows each time a batch lands
+            return None
+        entry = self.chrom_index().get(row.chrom)
+        if entry is None:
+            return None
+        starts, max_ends, regions = entry
+        # find this row among the regions sharing its start; the next region follows it
+        i = bisect_left(starts, row.start)
+        while i < len(regions) and starts[i] == row.start and regions[i] is not row:
+            i += 1
+        if i + 1 >= len(regions) or regions[i] is not row:
+            return None
+        return regions[i + 1].start - row.end
 
     def summarize_by_chrom(self, vd):
         """create a summary sheet with chromosome statistics."""
         chrom_stats = {}
-        for row in self.rows:
-            if row.chrom not in chrom_stats:
-                chrom_stats[row.chrom] = {
-                    'count': 0,
-                    'total_length': 0,
-                    'min_length': float('inf'),
-                    'max_length': 0
-                }
-            stats = chrom_stats[row.chrom]
-            length = self.get_region_length(row)
-            stats['count'] += 1
-            stats['total_length'] += length
-            stats['min_length'] = min(stats['min_length'], length)
-            stats['max_length'] = max(stats['max_length'], length)
+        # the chromosome index already groups the rows; reduce each group's lengths with builtins
+        index = self.chrom_index()
+        for chrom in sorted(index):
+            lengths = [row.end - row.start for row in index[chrom][2]]
+            chrom_stats[chrom] = {
+                'count': len(lengths),
+                'total_length': sum(lengths),
+                'min_length': min(lengths),
+                'max_length': max(lengths)
+            }
 
         summary_sheet = IndexSheet(f'{self.name}_chrom_summary', source=chrom_stats)
         summary_sheet.addColumn(Column('chromosome', getter=lambda c,r: r))
@@ -300,37 +384,32 @@ class BedPyblSheet(Sheet):  # Fix: capitalize class name
         try:
             min_size = int(min_size)
             max_size = int(max_size)
-            for row in self.rows:
-                length = self.get_region_length(row)
-                row.selected = min_size <= length <= max_size
+            # whole-sheet pass with inline arithmetic rather than a method call per row
+            self.clearSelected()
+            self.select([row for row in self.rows if min_size <= row.end - row.start <= max_size])
         except ValueError:
             vd.warning("invalid size value")
 
     def merge_overlapping(self, vd):
         """merge overlapping regions on same chromosome."""
         merged = []
-        current = None
-
-        # sort rows by chromosome and start position
-        sorted_rows = sorted(self.rows, key=lambda r: (r.chrom, r.start))
 
-        for row in sorted_rows:
-            if not current:
-                current = row
-                continue
-
-            if (current.chrom == row.chrom and
-                row.start <= current.end):
-                # merge overlapping regions
-                current.end = max(current.end, row.end)
-            else:
-                merged.append(current)
-                current = row
-
-        if current:
-            merged.append(current)
+        # index the current rows afresh: each chromosome's regions sorted by start, with
+        # a running max end. a region opens a new merged region exactly when it starts
+        # past the max end of everything before it. merged regions are new BedRows, so
+        # the original rows are never modified
+        index = IntervalIndex(self.rows, *self.interval_fields)
+        for chrom in sorted(index.by_chrom):
+            starts, max_ends, regions = index.by_chrom[chrom]
+            first = regions[0]
+            for i in range(1, len(regions)):
+                if starts[i] > max_ends[i - 1]:
+                    merged.append(BedRow(chrom, first.start, max_ends[i - 1], first.name, first.score, first.strand))
+                    first = regions[i]
+            merged.append(BedRow(chrom, first.start, max_ends[-1], first.name, first.score, first.strand))
 
         self.rows = merged
+        self.invalidate_interval_index()
         vd.status(f'merged into {len(merged)} regions')
 
     def convert_to_gff(self, vd):
@@ -355,14 +434,14 @@ class BedPyblSheet(Sheet):  # Fix: capitalize class name
             if bed_row.thick_end is not None:
                 attrs.append(f"thick_end={bed_row.thick_end}")
             if bed_row.item_rgb:
-                attrs.append(f"rgb={','.join(map(str, bed_row.item_rgb))}")
+                attrs.append(f"rgb={_join_csv(bed_row.item_rgb)}")
             if bed_row.block_count:
                 attrs.append(f"block_count={bed_row.block_count}")
             if bed_row.block_sizes:
-                attrs.append(f"block_sizes={','.join(map(str, bed_row.block_sizes))}")
+                attrs.append(f"block_sizes={_join_csv(bed_row.block_sizes)}")
             if bed_row.block_starts:
                 # convert relative starts to absolute 1-based coordinates
-                abs_starts = [start + bs for bs in bed_row.block_starts]
+                abs_starts = [start + bs for bs in _csv_ints(bed_row.block_starts)]
                 attrs.append(f"block_starts={','.join(map(str, abs_starts))}")
 
             # create gff fields
@@ -397,37 +476,50 @@ def save_bed(vd, p, *sheets):
             for line in sheet.header_lines:
                 fp.write(line + '\n')
 
-        # write records
-        for row in Progress(sheet.rows, 'saving'):
-            try:
-                if isinstance(row, pybed.BedRecord):
-                    # handle native bed records
-                    fields = [
-                        row.chrom,
-                        str(row.start),
-                        str(row.end),
-                        row.name or '.',
-                        row.score or '0',
-                        row.strand or '.'
-                    ]
-                    # add optional fields if present
-                    if row.thick_start is not None:
-                        fields.extend([str(row.thick_start), str(row.thick_end)])
-                        if row.item_rgb:
-                            fields.append(','.join(map(str, row.item_rgb)))
-                            if row.block_count:
-                                fields.extend([
-                                    str(row.block_count),
-                                    ','.join(map(str, row.block_sizes)),
-                                    ','.join(map(str, row.block_starts))
-                                ])
-                else:
-                    # handle conversion from other formats (like gff)
-                    fields = [str(col.getTypedValue(row)) for col in sheet.visibleCols[:6]]
-
-                fp.write('\t'.join(fields) + '\n')
-            except Exception as e:
-                vd.warning(f'error saving row: {e}')
+        # write records, formatting a batch of lines and writing it with one call
+        rows = sheet.rows
+        with Progress(gerund='saving', total=len(rows)) as prog:
+            for i in range(0, len(rows), SAVE_BATCH_SIZE):
+                batch = rows[i:i + SAVE_BATCH_SIZE]
+                lines = []
+                for row in batch:
+                    try:
+                        if isinstance(row, BedRow) or (pybed and isinstance(row, pybed.BedRecord)):
+                            # handle native bed records
+                            fields = [
+                                row.chrom,
+                                str(row.start),
+                                str(row.end),
+                                row.name or '.',
+                                row.score or '0',
+                                row.strand or '.'
+                            ]
+                            # add optional fields if present
+                            if row.thick_start is not None:
+                                fields.extend([str(row.thick_start), str(row.thick_end)])
+                                if row.item_rgb:
+                                    fields.append(_join_csv(row.item_rgb))
+                                    if row.block_count:
+                                        fields.extend([
+                                            str(row.block_count),
+                                            _join_csv(row.block_sizes),
+                                            _join_csv(row.block_starts)
+                                        ])
+                        else:
+                            # handle conversion from other formats (like gff)
+                            fields = [str(col.getTypedValue(row)) for col in sheet.visibleCols[:6]]
+
+                        lines.append('\t'.join(fields))
+                    except Exception as e:
+                        vd.warning(f'error saving row: {e}')
+
+                if lines:
+                    lines.append('')  # trailing newline for the last line of the batch
+                    fp.write('\n'.join(lines))
+                prog.addProgress(len(batch))
+
+BedPyblSheet.addCommand('', 'merge-overlapping', 'merge_overlapping(vd)',
+                        'merge overlapping regions on the same chromosome')
 
 # Make sure this is at the end of the file
 vd.filetype('bed', BedPyblSheet)
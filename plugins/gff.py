@@ -140,11 +140,13 @@ class GffSheet(Sheet):
     def convert_to_bed(self, vd):
         """Convert GFF records to BED format."""
         try:
-            from pybedlite import BedRecord
-            from bed_pybedlite import BedPyblSheet
+            try:
+                from .bed_pybedlite import BedPyblSheet, BedRow
+            except ImportError:  # imported outside the plugins package
+                from bed_pybedlite import BedPyblSheet, BedRow
         except ImportError as e:
             vd.error(
-                f"Import error: {str(e)}. Make sure pybedlite is installed and bed_pybedlite.py is in the plugins directory"
+                f"Import error: {str(e)}. Make sure bed_pybedlite.py is in the plugins directory"
             )
             return
 
@@ -179,8 +181,9 @@ class GffSheet(Sheet):
                     or options.gff_default_score
                 )
 
-                # Create BED record
-                bed_record = BedRecord(
+                # Create BED record; list fields are stored as comma-separated text,
+                # which is what the BED columns display and save_bed writes
+                bed_record = BedRow(
                     chrom=gff_row[0],
                     start=start,
                     end=end,
@@ -194,21 +197,15 @@ class GffSheet(Sheet):
                     thick_end=int(attrs.get("thick_end", end))
                     if "thick_end" in attrs
                     else None,
-                    item_rgb=[int(x) for x in attrs.get("rgb", "").split(",")]
-                    if "rgb" in attrs
-                    else None,
+                    item_rgb=attrs["rgb"] if "rgb" in attrs else None,
                     block_count=int(attrs.get("block_count"))
                     if "block_count" in attrs
                     else None,
-                    block_sizes=[
-                        int(x) for x in attrs.get("block_sizes", "").split(",")
-                    ]
-                    if "block_sizes" in attrs
-                    else None,
-                    block_starts=[
-                        int(x) - start - 1
-                        for x in attrs.get("block_starts", "").split(",")
-                    ]
+                    block_sizes=attrs["block_sizes"] if "block_sizes" in attrs else None,
+                    block_starts=",".join(
+                        str(int(x) - start - 1)
+                        for x in attrs["block_starts"].split(",")
+                    )
                     if "block_starts" in attrs
                     else None,
                 )